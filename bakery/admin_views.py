@@ -1,22 +1,30 @@
-from datetime import datetime, timedelta
+from datetime import timedelta
 import logging
 
-from django.db import models
+from django.db import connection, models
 from django.db.models import Sum, Count, F, Value
+from django.db.models.expressions import RawSQL
 from django.db.models.functions import TruncDate, Coalesce
 from django.utils import timezone
 from django.utils.timezone import make_aware
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, permissions, status, viewsets
+from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from core.pagination import AuditCursorPagination
+
+from .dates import parse_iso_datetime
 from .models import AuditLog, Product, Outlet, StockLedger, Sale, SaleItem
-from .serializers import AuditLogSerializer, StockAlertRow
+from .permissions import MANAGER_GROUP, OWNER_GROUP, _has_group
+from .serializers import AuditLogListSerializer, AuditLogSerializer, StockAlertRow
 
 log = logging.getLogger(__name__)
 
+# pg_trgm indexes only help substring searches of at least three characters.
+MIN_SUBSTRING_SEARCH = 3
+
 
 class IsOwnerOrManager(permissions.BasePermission):
     def has_permission(self, request, view):
@@ -25,19 +33,28 @@ class IsOwnerOrManager(permissions.BasePermission):
             return False
         if user.is_superuser:
             return True
-        return user.groups.filter(name__in=["Owner", "Manager"]).exists()
+        return _has_group(request, OWNER_GROUP) or _has_group(request, MANAGER_GROUP)
 
 
 class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = AuditLog.objects.select_related("actor").all().order_by("-created_at")
+    queryset = AuditLog.objects.select_related("actor").all()
     serializer_class = AuditLogSerializer
     permission_classes = [IsOwnerOrManager]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    pagination_class = AuditCursorPagination
+    filter_backends = [DjangoFilterBackend]
     filterset_fields = ["action", "table"]
-    search_fields = ["row_id", "actor__email", "actor__username"]
+    list_only_fields = ("id", "actor", "actor__email", "action", "table", "row_id", "ip", "ua", "created_at")
+
+    def get_serializer_class(self):
+        if self.action == "list":
+            return AuditLogListSerializer
+        return super().get_serializer_class()
 
     def get_queryset(self):
         qs = super().get_queryset()
+        if self.action == "list":
+            # Skip the before/after JSON payloads and unused user columns on list pages.
+            qs = qs.only(*self.list_only_fields)
         params = self.request.query_params
         action = params.get("action")
         if action:
@@ -45,28 +62,47 @@ class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
         table = params.get("table")
         if table:
             qs = qs.filter(table__icontains=table)
-        date_from = params.get("from")
-        if date_from:
-            try:
-                qs = qs.filter(created_at__gte=make_aware(datetime.fromisoformat(date_from)))
-            except ValueError:
-                pass
-        date_to = params.get("to")
-        if date_to:
-            try:
-                qs = qs.filter(created_at__lte=make_aware(datetime.fromisoformat(date_to)))
-            except ValueError:
-                pass
+        date_from = parse_iso_datetime(params.get("from") or "")
+        if date_from is not None:
+            qs = qs.filter(created_at__gte=date_from if date_from.tzinfo else make_aware(date_from))
+        date_to = parse_iso_datetime(params.get("to") or "")
+        if date_to is not None:
+            qs = qs.filter(created_at__lte=date_to if date_to.tzinfo else make_aware(date_to))
         search = params.get("search")
         if search:
-            qs = qs.filter(
-                models.Q(row_id__icontains=search)
-                | models.Q(actor__email__icontains=search)
-                | models.Q(actor__username__icontains=search)
+            # Too short for the trigram indexes; match whole values instead of scanning.
+            short = len(search) < MIN_SUBSTRING_SEARCH
+            lookup = "iexact" if short else "icontains"
+            filters = models.Q(**{f"actor__email__{lookup}": search}) | models.Q(
+                **{f"actor__username__{lookup}": search}
             )
+            # row_id only ever holds primary keys, so only digit strings can match it.
+            if search.isdecimal():
+                filters |= models.Q(row_id=search) if short else models.Q(row_id__icontains=search)
+            qs = qs.filter(filters)
+        q = params.get("q")
+        if q:
+            qs = qs.filter(_payload_search(q))
         return qs
 
 
+def _payload_search(q):
+    """Full-text match on the before/after payloads and user agent.
+
+    Postgres matches the expression indexed by migration 0018 (``audit_search_idx``);
+    other databases fall back to substring matching.
+    """
+    if connection.vendor == "postgresql":
+        return RawSQL(
+            "to_tsvector('simple', coalesce(bakery_auditlog.before::text, '') || ' ' || "
+            "coalesce(bakery_auditlog.after::text, '') || ' ' || coalesce(bakery_auditlog.ua, '')) "
+            "@@ websearch_to_tsquery('simple', %s)",
+            (q,),
+            output_field=models.BooleanField(),
+        )
+    return models.Q(before__icontains=q) | models.Q(after__icontains=q) | models.Q(ua__icontains=q)
+
+
 def current_stock_by_product_outlet():
     rows = (
         StockLedger.objects.values("item_type", "item_id", "outlet_id")
@@ -85,9 +121,9 @@ def current_stock_by_product_outlet():
 @permission_classes([IsOwnerOrManager])
 def stock_check_now(request):
     stock = current_stock_by_product_outlet()
-    outlets = {o.id: o for o in Outlet.objects.all()}
+    outlets = {o.id: o for o in Outlet.objects.only("id", "name")}
     data = []
-    for product in Product.objects.all():
+    for product in Product.objects.only("id", "name", "reorder_threshold"):
         threshold = float(product.reorder_threshold or 0)
         if threshold <= 0:
             continue
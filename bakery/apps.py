@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class BakeryConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "bakery"
+
+    def ready(self):
+        # Connect signal handlers for every process, not only the ones that load urls.
+        from . import audit, report_cache  # noqa: F401
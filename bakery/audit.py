@@ -1,9 +1,19 @@
 from __future__ import annotations
 
+import logging
 from typing import Any, Optional
 
+from asgiref.local import Local
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections, transaction
+
 from .models_audit import AuditLog
 
+log = logging.getLogger(__name__)
+
+# Audit rows queued by the current request; ``rows`` is None outside a request.
+_audit_buffer = Local()
+
 
 def _extract_ip(request) -> Optional[str]:
     if request is None:
@@ -15,11 +25,15 @@ def _extract_ip(request) -> Optional[str]:
 
 
 def write_audit(request, action: str, instance, *, before: Any = None, after: Any = None) -> None:
-    """Persist an audit entry for the given instance."""
+    """Record an audit entry for the given instance.
+
+    During a request the row is buffered (once its transaction commits) and
+    inserted in bulk when the request finishes; otherwise it is saved immediately.
+    """
     user = getattr(request, "user", None)
     actor = user if getattr(user, "is_authenticated", False) else None
 
-    AuditLog.objects.create(
+    row = dict(
         actor=actor,
         action=(action or "").lower(),
         table=instance._meta.model_name,
@@ -29,3 +43,34 @@ def write_audit(request, action: str, instance, *, before: Any = None, after: An
         ip=_extract_ip(request),
         ua=request.META.get("HTTP_USER_AGENT") if request else None
     )
+
+    rows = getattr(_audit_buffer, "rows", None)
+    if rows is None:
+        AuditLog.objects.create(**row)
+    else:
+        transaction.on_commit(lambda: rows.append(row))
+
+
+def _start_audit_buffer(**kwargs) -> None:
+    _audit_buffer.rows = []
+
+
+def flush_audit_buffer(**kwargs) -> None:
+    """Insert the audit rows buffered during the current request."""
+    rows = getattr(_audit_buffer, "rows", None)
+    _audit_buffer.rows = None
+    if not rows:
+        return
+    try:
+        AuditLog.objects.bulk_create([AuditLog(**row) for row in rows])
+    except Exception:
+        log.exception("Failed to write %d buffered audit rows", len(rows))
+    # Django's own request_finished handler may already have run; don't leave
+    # the connection opened by this insert dangling until the next request.
+    # An enclosing atomic block (e.g. a TestCase) still owns the connection.
+    if not transaction.get_connection().in_atomic_block:
+        close_old_connections()
+
+
+request_started.connect(_start_audit_buffer, dispatch_uid="bakery.audit.start")
+request_finished.connect(flush_audit_buffer, dispatch_uid="bakery.audit.flush")
@@ -63,7 +63,7 @@ def compute_cogs_for_sale(sale: Sale, method: str = CogsEntry.FIFO) -> None:
 
     with transaction.atomic():
         for item in items:
-            if CogsEntry.objects.filter(sale_item=item).exists():
+            if CogsEntry.objects.filter(sale_item_id=item.id).exists():
                 continue
 
             product = item.product
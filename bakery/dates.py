@@ -0,0 +1,23 @@
+"""Cached ISO date parsing for query-string filters."""
+
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional
+
+_DATE_RE = re.compile(r"^(\d{4})-(\d{2})-(\d{2})$")
+
+
+@lru_cache(maxsize=2048)
+def parse_iso_datetime(value: str) -> Optional[datetime]:
+    """Parse an ISO date or datetime string, returning None when malformed.
+
+    Plain ``YYYY-MM-DD`` values (the common dashboard case) skip the full ISO parser.
+    """
+    match = _DATE_RE.match(value)
+    try:
+        if match:
+            return datetime(int(match[1]), int(match[2]), int(match[3]))
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
@@ -0,0 +1,3 @@
+"""Pre-encoded liveness response body shared by the health view and RequestTimingMiddleware."""
+
+HEALTH_BODY = b'{"status":"ok"}'
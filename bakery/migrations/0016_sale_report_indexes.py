@@ -0,0 +1,58 @@
+from django.db import migrations, models
+
+SALE_INDEXES = [
+    models.Index(fields=["billed_at", "outlet"], name="sale_billed_outlet_idx"),
+    models.Index(fields=["outlet", "-billed_at"], name="sale_outlet_billed_idx"),
+]
+SALEITEM_INDEXES = [
+    models.Index(fields=["sale", "product"], name="saleitem_sale_product_idx"),
+]
+
+
+def _indexes(apps):
+    sale, saleitem = apps.get_model("bakery", "Sale"), apps.get_model("bakery", "SaleItem")
+    return [(sale, index) for index in SALE_INDEXES] + [(saleitem, index) for index in SALEITEM_INDEXES]
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        for model, index in _indexes(apps):
+            schema_editor.add_index(model, index)
+        return
+    # Build without blocking POS writes; large tables can outlast statement_timeout.
+    schema_editor.execute("SET statement_timeout = 0")
+    try:
+        for model, index in _indexes(apps):
+            schema_editor.add_index(model, index, concurrently=True)
+    finally:
+        schema_editor.execute("RESET statement_timeout")
+
+
+def drop_indexes(apps, schema_editor):
+    concurrently = schema_editor.connection.vendor == "postgresql"
+    for model, index in _indexes(apps):
+        if concurrently:
+            schema_editor.remove_index(model, index, concurrently=True)
+        else:
+            schema_editor.remove_index(model, index)
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ("bakery", "0015_ingredient_active_ingredient_unit_cost_and_more"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                *(migrations.AddIndex(model_name="sale", index=index) for index in SALE_INDEXES),
+                *(migrations.AddIndex(model_name="saleitem", index=index) for index in SALEITEM_INDEXES),
+            ],
+            database_operations=[
+                migrations.RunPython(create_indexes, drop_indexes),
+            ],
+        ),
+    ]
@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.db import migrations
+
+# Expressions match what Postgres emits for ``__icontains`` (UPPER(col::text) LIKE ...)
+# so the planner can use the trigram indexes for the audit log search.
+AUDIT_TRGM_INDEXES = [
+    ("audit_row_id_trgm", "bakery_auditlog", "row_id"),
+]
+USER_TRGM_INDEXES = [
+    ("audit_actor_username_trgm", "username"),
+    ("audit_actor_email_trgm", "email"),
+]
+
+
+def _user_table(apps):
+    return apps.get_model(settings.AUTH_USER_MODEL)._meta.db_table
+
+
+def create_trgm_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    indexes = AUDIT_TRGM_INDEXES + [(name, _user_table(apps), column) for name, column in USER_TRGM_INDEXES]
+    # Building on large tables can outlast the connection's statement_timeout.
+    schema_editor.execute("SET statement_timeout = 0")
+    try:
+        for name, table, column in indexes:
+            schema_editor.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON "{table}" '
+                f'USING gin (UPPER("{column}"::text) gin_trgm_ops)'
+            )
+    finally:
+        schema_editor.execute("RESET statement_timeout")
+
+
+def drop_trgm_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, *_ in AUDIT_TRGM_INDEXES + USER_TRGM_INDEXES:
+        schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction; building
+    # concurrently keeps audit writes and logins (last_login) unblocked.
+    atomic = False
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("bakery", "0016_sale_report_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trgm_indexes, drop_trgm_indexes),
+    ]
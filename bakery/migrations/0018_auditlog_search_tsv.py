@@ -0,0 +1,41 @@
+from django.db import migrations
+
+# Must match the expression in bakery.admin_views._payload_search so the planner
+# uses the index. An expression index (rather than a stored generated column)
+# avoids rewriting the audit table under an ACCESS EXCLUSIVE lock.
+SEARCH_TSV = (
+    "to_tsvector('simple', "
+    "coalesce(before::text, '') || ' ' || coalesce(after::text, '') || ' ' || coalesce(ua, ''))"
+)
+
+
+def add_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    # Building on a large table can outlast the connection's statement_timeout.
+    schema_editor.execute("SET statement_timeout = 0")
+    try:
+        schema_editor.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS audit_search_idx ON bakery_auditlog USING gin ({SEARCH_TSV})"
+        )
+    finally:
+        schema_editor.execute("RESET statement_timeout")
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX CONCURRENTLY IF EXISTS audit_search_idx")
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ("bakery", "0017_auditlog_search_trgm"),
+    ]
+
+    operations = [
+        migrations.RunPython(add_search_index, drop_search_index),
+    ]
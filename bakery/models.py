@@ -79,6 +79,12 @@ class Sale(models.Model):
     total     = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     payment_mode = models.CharField(max_length=20, default="UPI")
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["billed_at", "outlet"], name="sale_billed_outlet_idx"),
+            models.Index(fields=["outlet", "-billed_at"], name="sale_outlet_billed_idx"),
+        ]
+
 class SaleItem(models.Model):
     sale    = models.ForeignKey(Sale, on_delete=models.CASCADE, related_name="items")
     product = models.ForeignKey(Product, on_delete=models.PROTECT)
@@ -86,6 +92,11 @@ class SaleItem(models.Model):
     unit_price = models.DecimalField(max_digits=10, decimal_places=2)
     tax_pct = models.DecimalField(max_digits=5, decimal_places=2, default=0)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["sale", "product"], name="saleitem_sale_product_idx"),
+        ]
+
 class Wastage(models.Model):
     outlet = models.ForeignKey(Outlet, on_delete=models.PROTECT)
     product = models.ForeignKey(Product, on_delete=models.PROTECT)
@@ -74,7 +74,7 @@ class PayrollCalculationView(APIView):
 
         attendance_counts = (
             Attendance.objects.filter(
-                employee__in=employees,
+                employee_id__in=[employee.id for employee in employees],
                 date__gte=period.start_date,
                 date__lte=period.end_date,
             )
@@ -6,8 +6,17 @@ MANAGER_GROUP = "Manager"
 CASHIER_GROUP = "Cashier"
 
 
-def _has_group(user, name: str) -> bool:
-    return user.groups.filter(name=name).exists()
+def _group_names(request) -> frozenset:
+    """Names of the requesting user's groups, loaded at most once per request."""
+    names = getattr(request, "_cached_group_names", None)
+    if names is None:
+        names = frozenset(request.user.groups.values_list("name", flat=True))
+        request._cached_group_names = names
+    return names
+
+
+def _has_group(request, name: str) -> bool:
+    return name in _group_names(request)
 
 
 class IsOwner(BasePermission):
@@ -16,7 +25,7 @@ class IsOwner(BasePermission):
         return bool(
             user
             and user.is_authenticated
-            and (user.is_superuser or _has_group(user, OWNER_GROUP))
+            and (user.is_superuser or _has_group(request, OWNER_GROUP))
         )
 
 
@@ -25,9 +34,9 @@ class IsManagerOrAbove(BasePermission):
         user = request.user
         if not user or not user.is_authenticated:
             return False
-        if user.is_superuser or _has_group(user, OWNER_GROUP):
+        if user.is_superuser or _has_group(request, OWNER_GROUP):
             return True
-        return _has_group(user, MANAGER_GROUP)
+        return _has_group(request, MANAGER_GROUP)
 
 
 class IsCashierOrAbove(BasePermission):
@@ -35,9 +44,9 @@ class IsCashierOrAbove(BasePermission):
         user = request.user
         if not user or not user.is_authenticated:
             return False
-        if user.is_superuser or _has_group(user, OWNER_GROUP) or _has_group(user, MANAGER_GROUP):
+        if user.is_superuser or _has_group(request, OWNER_GROUP) or _has_group(request, MANAGER_GROUP):
             return True
-        return _has_group(user, CASHIER_GROUP)
+        return _has_group(request, CASHIER_GROUP)
 
 
 class ReadOnly(BasePermission):
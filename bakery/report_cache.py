@@ -0,0 +1,63 @@
+"""Short-lived response cache for the dashboard report endpoints."""
+
+import functools
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.response import Response
+
+from .models import Sale, SaleItem
+
+REPORT_CACHE_TTL = 45
+_VERSION_KEY = "rpt:version"
+
+
+def _report_version():
+    # Seeded from the clock so an evicted counter never revives stale entries.
+    return cache.get_or_set(_VERSION_KEY, time.time_ns, None)
+
+
+def cached_report(ttl: int = REPORT_CACHE_TTL):
+    """Cache a report view's response data keyed by view name and query string."""
+
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(request, *args, **kwargs):
+            key = f"rpt:{_report_version()}:{fn.__name__}:{request.query_params.urlencode()}"
+            data = cache.get(key)
+            if data is not None:
+                return Response(data)
+            response = fn(request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response.data, ttl)
+            return response
+
+        return inner
+
+    return wrap
+
+
+def _bump_report_version():
+    try:
+        cache.incr(_VERSION_KEY)
+    except ValueError:
+        cache.set(_VERSION_KEY, time.time_ns(), None)
+
+
+@receiver([post_save, post_delete], sender=Sale)
+@receiver([post_save, post_delete], sender=SaleItem)
+def invalidate_report_cache(sender, **kwargs):
+    """Bump the report cache version once the sales change commits.
+
+    Bumping before the commit would let a concurrent report cache pre-commit
+    data under the new version. A sale and its items share one bump per
+    transaction; a rolled-back transaction drops its pending callback, so
+    nothing is left suppressed.
+    """
+    connection = transaction.get_connection()
+    if any(entry[1] is _bump_report_version for entry in connection.run_on_commit):
+        return
+    transaction.on_commit(_bump_report_version)
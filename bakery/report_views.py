@@ -1,5 +1,5 @@
 from decimal import Decimal, ROUND_HALF_UP
-from datetime import timedelta, datetime
+from datetime import datetime, time, timedelta
 from collections import defaultdict
 
 from django.db.models import (
@@ -21,7 +21,9 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
+from .dates import parse_iso_datetime
 from .models import Sale, SaleItem, StockLedger, CogsEntry, PayrollEntry, PayrollPeriod, RecipeItem
+from .report_cache import cached_report
 
 
 # =========================
@@ -38,10 +40,8 @@ def money(value) -> str:
 def _parse_date(value):
     if not value:
         return None
-    try:
-        return datetime.fromisoformat(value).date()
-    except ValueError:
-        return None
+    parsed = parse_iso_datetime(value)
+    return parsed.date() if parsed else None
 
 
 def _dt_range(period: str):
@@ -68,6 +68,21 @@ def _dt_range(period: str):
     return start, today, trunc
 
 
+def _billed_between(start, end, prefix=""):
+    """Filter kwargs selecting local dates ``start``..``end`` (inclusive) on ``billed_at``.
+
+    Unlike ``billed_at__date`` lookups, which compare a time-zone-converted
+    expression, the half-open datetime range can use the billed_at indexes.
+    """
+    return {
+        f"{prefix}billed_at__gte": timezone.make_aware(datetime.combine(start, time.min)),
+        f"{prefix}billed_at__lt": timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min)),
+    }
+
+
+_GRANULARITY_TRUNC = {"week": TruncWeek, "month": TruncMonth}
+
+
 # Common revenue expression: CAST(qty) * CAST(unit_price) * (1 + tax_pct/100)
 def _line_revenue_expr():
     return ExpressionWrapper(
@@ -84,15 +99,14 @@ def _line_revenue_expr():
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@cached_report()
 def reports_sales_trend(request):
     """Daily sales totals (or auto granularity by range). Returns [{date, amount:number}]."""
     period = request.query_params.get("range", "30d")
     start, end, trunc = _dt_range(period)
 
     # --- PERF UPGRADE START ---
-    sale_qs = Sale.objects.only("id", "billed_at", "total").filter(
-        billed_at__date__gte=start, billed_at__date__lte=end
-    )
+    sale_qs = Sale.objects.only("id", "billed_at", "total").filter(**_billed_between(start, end))
     # --- PERF UPGRADE END ---
     qs = (
         sale_qs
@@ -107,6 +121,7 @@ def reports_sales_trend(request):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@cached_report()
 def reports_top_products(request):
     """Top products by revenue for the last 30 days. Returns [{name, value:number}]."""
     today = timezone.localdate()
@@ -115,17 +130,18 @@ def reports_top_products(request):
     line_revenue = _line_revenue_expr()
 
     qs = (
-        SaleItem.objects.filter(sale__billed_at__date__gte=start, sale__billed_at__date__lte=today)
+        SaleItem.objects.filter(**_billed_between(start, today, prefix="sale__"))
         .values("product_id", "product__name")
         .annotate(revenue=Coalesce(Sum(line_revenue), Decimal("0")))
         .order_by("-revenue")[:5]
     )
-    data = [{"name": r["product__name"] or "Unknown", "value": float(r["revenue"] or 0)} for r in qs]
+    data = [{"name": r["product__name"] or "Unknown", "value": float(r["revenue"])} for r in qs]
     return Response(data)
 
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@cached_report()
 def reports_top_outlets(request):
     """Top outlets by revenue for the last 30 days. Returns [{name, value:number}]."""
     today = timezone.localdate()
@@ -135,7 +151,7 @@ def reports_top_outlets(request):
     sales_base = (
         Sale.objects.only("id", "billed_at", "total", "outlet_id")
         .select_related("outlet")
-        .filter(billed_at__date__gte=start, billed_at__date__lte=today)
+        .filter(**_billed_between(start, today))
     )
     # --- PERF UPGRADE END ---
     qs = (
@@ -144,7 +160,7 @@ def reports_top_outlets(request):
         .annotate(total=Coalesce(Sum("total"), Decimal("0")))
         .order_by("-total")[:5]
     )
-    data = [{"name": r["outlet__name"] or "Unknown", "value": float(r["total"] or 0)} for r in qs]
+    data = [{"name": r["outlet__name"] or "Unknown", "value": float(r["total"])} for r in qs]
     return Response(data)
 
 
@@ -176,7 +192,7 @@ def owner_summary(request):
     # --- PERF UPGRADE START ---
     sales_30d_qs = (
         Sale.objects.only("id", "billed_at", "total", "outlet_id")
-        .filter(billed_at__date__gte=window_start, billed_at__date__lte=today)
+        .filter(**_billed_between(window_start, today))
     )
     # --- PERF UPGRADE END ---
     sales_30d_total = sales_30d_qs.aggregate(total=Sum("total"))["total"] or Decimal("0")
@@ -186,7 +202,7 @@ def owner_summary(request):
     # --- PERF UPGRADE START ---
     sales_today_total = (
         Sale.objects.only("total")
-        .filter(billed_at__date=today)
+        .filter(**_billed_between(today, today))
         .aggregate(total=Sum("total"))["total"]
         or Decimal("0")
     )
@@ -203,10 +219,7 @@ def owner_summary(request):
     # Top products — compute revenue per item in Python
     per_product = {}
     items_qs = (
-        SaleItem.objects.filter(
-            sale__billed_at__date__gte=window_start,
-            sale__billed_at__date__lte=today,
-        )
+        SaleItem.objects.filter(**_billed_between(window_start, today, prefix="sale__"))
         .select_related("product")
         .values("product_id", "product__name", "qty", "unit_price", "tax_pct")
     )
@@ -385,13 +398,7 @@ def exec_summary(request):
     period = request.query_params.get("range", "30d")
     start, end, trunc_default = _dt_range(period)
 
-    gran = request.query_params.get("granularity")
-    if gran == "week":
-        trunc = TruncWeek
-    elif gran == "month":
-        trunc = TruncMonth
-    else:
-        trunc = trunc_default
+    trunc = _GRANULARITY_TRUNC.get(request.query_params.get("granularity"), trunc_default)
 
     limit = int(request.query_params.get("limit", "5"))
 
@@ -399,7 +406,7 @@ def exec_summary(request):
     qs_sales = (
         Sale.objects.only("id", "billed_at", "total", "outlet_id")
         .select_related("outlet")
-        .filter(billed_at__date__gte=start, billed_at__date__lte=end)
+        .filter(**_billed_between(start, end))
     )
     sale_items_qs = (
         SaleItem.objects.filter(sale__in=qs_sales)
@@ -500,10 +507,7 @@ def reports_revenue_vs_cogs(request):
         queryset=RecipeItem.objects.select_related("ingredient").all(),
     )
     sale_items = (
-        SaleItem.objects.filter(
-            sale__billed_at__date__gte=start_date,
-            sale__billed_at__date__lte=end_date,
-        )
+        SaleItem.objects.filter(**_billed_between(start_date, end_date, prefix="sale__"))
         .select_related("sale", "product")
         .prefetch_related(recipe_items_prefetch)
     )
@@ -216,6 +216,23 @@ class SaleSerializer(serializers.ModelSerializer):
         read_only_fields = ["subtotal", "tax", "total", "billed_at"]
 
     def validate(self, attrs):
+        if self.instance is not None:
+            # A billed sale only allows its payment mode to change: line items,
+            # totals and stock ledger entries are not recomputed on update.
+            if "write_items" in attrs:
+                raise serializers.ValidationError(
+                    {"write_items": "Line items cannot be changed after billing."}
+                )
+            locked = [
+                key for key, value in attrs.items()
+                if key != "payment_mode" and getattr(self.instance, key) != value
+            ]
+            if locked:
+                raise serializers.ValidationError(
+                    {key: "Cannot be changed after billing." for key in locked}
+                )
+            return attrs
+
         # Basic check: at least one line
         lines = attrs.get("write_items") or []
         if not lines:
@@ -313,6 +330,23 @@ class AuditLogSerializer(serializers.ModelSerializer):
         ]
 
 
+class AuditLogListSerializer(AuditLogSerializer):
+    """List rows omit the before/after payloads; fetch a single entry for those."""
+
+    class Meta(AuditLogSerializer.Meta):
+        fields = [
+            "id",
+            "actor",
+            "actor_email",
+            "action",
+            "table",
+            "row_id",
+            "ip",
+            "ua",
+            "created_at",
+        ]
+
+
 class StockAlertRow(serializers.Serializer):
     product_id = serializers.IntegerField()
     product_name = serializers.CharField()
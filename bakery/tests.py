@@ -1,3 +1,160 @@
-from django.test import TestCase
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from .audit import write_audit
+from .models import AuditLog, Outlet, Product, Sale, SaleItem
+from .serializers import SaleSerializer
+
+User = get_user_model()
+
+
+@contextmanager
+def _without_close_old_connections():
+    # Like Django's test client: don't let request signals close the test transaction.
+    request_started.disconnect(close_old_connections)
+    request_finished.disconnect(close_old_connections)
+    try:
+        yield
+    finally:
+        request_started.connect(close_old_connections)
+        request_finished.connect(close_old_connections)
+
+
+class SaleFixtureMixin:
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser("owner", "owner@example.com", "pw")
+        cls.outlet = Outlet.objects.create(name="Main")
+        cls.other_outlet = Outlet.objects.create(name="Second")
+        cls.products = [
+            Product.objects.create(name=f"Bun {i}", sku=f"BUN-{i}", mrp=Decimal("10.00"))
+            for i in range(2)
+        ]
+
+    def make_sale(self):
+        sale = Sale.objects.create(outlet=self.outlet, subtotal=Decimal("20.00"), total=Decimal("20.00"))
+        for product in self.products:
+            SaleItem.objects.create(sale=sale, product=product, qty=1, unit_price=Decimal("10.00"))
+        return sale
+
+
+class SaleListQueryTests(SaleFixtureMixin, APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_list_query_count_does_not_grow_with_rows(self):
+        url = reverse("sale-list")
+        self.make_sale()
+        # count + sales joined to outlet + prefetched items + prefetched products
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+        for _ in range(4):
+            self.make_sale()
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data["results"]), 5)
+        first = response.data["results"][0]
+        self.assertEqual(first["outlet_detail"]["name"], "Main")
+        self.assertEqual({item["product_name"] for item in first["items"]}, {"Bun 0", "Bun 1"})
+
+
+class SaleUpdateTests(SaleFixtureMixin, APITestCase):
+    def setUp(self):
+        self.sale = self.make_sale()
+        self.client.force_authenticate(self.user)
+
+    def test_payment_mode_can_change(self):
+        serializer = SaleSerializer(self.sale, data={"payment_mode": "CASH"}, partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+    def test_unchanged_fields_are_accepted(self):
+        data = {"outlet": self.outlet.pk, "discount": "0.00", "payment_mode": "CARD"}
+        serializer = SaleSerializer(self.sale, data=data, partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+    def test_other_field_changes_are_rejected(self):
+        data = {"outlet": self.other_outlet.pk, "discount": "5.00"}
+        serializer = SaleSerializer(self.sale, data=data, partial=True)
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(set(serializer.errors), {"outlet", "discount"})
+
+    def test_line_items_are_rejected(self):
+        data = {"write_items": [{"product": self.products[0].pk, "qty": 1}]}
+        serializer = SaleSerializer(self.sale, data=data, partial=True)
+        self.assertFalse(serializer.is_valid())
+        self.assertIn("write_items", serializer.errors)
+
+    def test_patch_saves_payment_mode_only(self):
+        url = reverse("sale-detail", args=[self.sale.pk])
+        response = self.client.patch(url, {"payment_mode": "CASH"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.sale.refresh_from_db()
+        self.assertEqual(self.sale.payment_mode, "CASH")
+
+        response = self.client.patch(url, {"discount": "5.00"}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.sale.refresh_from_db()
+        self.assertEqual(self.sale.discount, Decimal("0.00"))
+
+
+class AuditBufferTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("cashier", "cashier@example.com", "pw")
+        cls.outlet = Outlet.objects.create(name="Main")
+
+    def test_rows_are_buffered_until_request_finished(self):
+        request = RequestFactory().get("/")
+        request.user = self.user
+        with _without_close_old_connections():
+            request_started.send(sender=self.__class__)
+            with self.captureOnCommitCallbacks(execute=True):
+                write_audit(request, "create", self.outlet, after={"name": "Main"})
+                write_audit(request, "update", self.outlet, before={"name": "Main"}, after={"name": "Central"})
+            self.assertFalse(AuditLog.objects.exists())
+            request_finished.send(sender=self.__class__)
+
+        self.assertEqual(
+            sorted(AuditLog.objects.values_list("action", flat=True)),
+            ["create", "update"],
+        )
+
+    def test_rows_are_written_immediately_outside_a_request(self):
+        write_audit(None, "delete", self.outlet, before={"name": "Main"})
+        self.assertEqual(AuditLog.objects.count(), 1)
+
+
+class AuditLogPaginationTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser("owner", "owner@example.com", "pw")
+        now = timezone.now()
+        for minutes in range(3):
+            entry = AuditLog.objects.create(action="create", table="outlet", row_id=str(minutes))
+            AuditLog.objects.filter(pk=entry.pk).update(created_at=now - timedelta(minutes=minutes))
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_cursor_pages_newest_first(self):
+        response = self.client.get(reverse("audit-log-list"), {"page_size": 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("count", response.data)
+        self.assertEqual([row["row_id"] for row in response.data["results"]], ["0", "1"])
+        self.assertIsNone(response.data["previous"])
+        self.assertNotIn("before", response.data["results"][0])
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual([row["row_id"] for row in response.data["results"]], ["2"])
+        self.assertIsNone(response.data["next"])
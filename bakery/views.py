@@ -1,20 +1,23 @@
 # bakery/views.py
-from datetime import timedelta
+import json
+from types import MappingProxyType
 
-from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import connection
-from django.db.models import Sum, F
-from django.utils import timezone
-from django.db.models.functions import TruncDay, TruncWeek, TruncMonth
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.http import require_safe
 
 from rest_framework import status, viewsets
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from .audit import write_audit
-from .models import Outlet, Product, Batch, Sale
-from .permissions import IsManagerOrAbove, IsCashierOrAbove
+from .health import HEALTH_BODY
+from .models import Outlet, Product, Batch, Sale, UserProfile
+from .permissions import IsManagerOrAbove, IsCashierOrAbove, _group_names
 from .serializers import (
     OutletSerializer,
     ProductSerializer,
@@ -22,22 +25,38 @@ from .serializers import (
     SaleSerializer,
 )
 
+User = get_user_model()
+
+ROLE_MAP = MappingProxyType({"owner": "owner", "manager": "manager", "cashier": "cashier"})
+
+_READ_ACTIONS = frozenset(("list", "retrieve"))
+
+_HEALTH_DB_OK_BODY = b'{"ok":true}'
+
+HEALTH_DB_CACHE_KEY = "health_db"
+HEALTH_DB_CACHE_TTL = 1
+
 
 class BaseAuditedViewSet(viewsets.ModelViewSet):
     read_permission = IsCashierOrAbove
     write_permission = IsManagerOrAbove
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Permission classes are stateless, so build the instances once per viewset.
+        cls._read_permissions = (IsAuthenticated(), cls.read_permission())
+        cls._write_permissions = (IsAuthenticated(), cls.write_permission())
+
     def get_permissions(self):
-        permissions = [IsAuthenticated()]
-        if self.action in ["list", "retrieve"]:
-            permissions.append(self.read_permission())
-        else:
-            permissions.append(self.write_permission())
-        return permissions
+        if self.action in _READ_ACTIONS:
+            return self._read_permissions
+        return self._write_permissions
 
     def _serialize_instance(self, instance):
-        serializer = self.get_serializer(instance)
-        return serializer.data
+        # Plain column values are enough for the audit trail; skip the DRF
+        # serializer walk and round-trip through JSON so dates/decimals are safe.
+        values = {field.name: getattr(instance, field.attname) for field in instance._meta.concrete_fields}
+        return json.loads(json.dumps(values, cls=DjangoJSONEncoder))
 
     def perform_create(self, serializer):
         instance = serializer.save()
@@ -47,8 +66,18 @@ class BaseAuditedViewSet(viewsets.ModelViewSet):
     def perform_update(self, serializer):
         before = self._serialize_instance(serializer.instance)
         instance = serializer.save()
+        self._audit_update(instance, before)
+
+    def _audit_update(self, instance, before):
         after = self._serialize_instance(instance)
-        write_audit(self.request, "update", instance, before=before, after=after)
+        changed = [key for key, value in after.items() if before.get(key) != value]
+        write_audit(
+            self.request,
+            "update",
+            instance,
+            before={key: before.get(key) for key in changed},
+            after={key: after[key] for key in changed},
+        )
 
     def perform_destroy(self, instance):
         before = self._serialize_instance(instance)
@@ -72,28 +101,59 @@ class BatchViewSet(BaseAuditedViewSet):
 
 
 class SaleViewSet(BaseAuditedViewSet):
-    queryset = Sale.objects.all()
+    # SaleSerializer renders outlet_detail and each item's product_name.
+    queryset = Sale.objects.select_related("outlet").prefetch_related("items__product").order_by("-billed_at")
     serializer_class = SaleSerializer
     read_permission = IsCashierOrAbove
     write_permission = IsCashierOrAbove
 
+    def perform_update(self, serializer):
+        # SaleSerializer only lets payment_mode change after billing, so save
+        # just that column; save() keeps post_save (report cache) firing.
+        instance = serializer.instance
+        before = self._serialize_instance(instance)
+        instance.payment_mode = serializer.validated_data.get("payment_mode", instance.payment_mode)
+        instance.save(update_fields=["payment_mode"])
+        self._audit_update(instance, before)
+
 
 # --- Simple utility endpoints -------------------------------------------------
 
 
+def _user_profile(request):
+    """Return the user's profile with its outlet joined, fetched at most once per request."""
+    user = request.user
+    if User.profile.is_cached(user):
+        # Already joined by ProfileJWTAuthentication.
+        return getattr(user, "profile", None)
+    if not hasattr(request, "_user_profile"):
+        request._user_profile = (
+            UserProfile.objects.select_related("outlet").filter(user_id=request.user.pk).first()
+        )
+    return request._user_profile
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def me(request):
     """Return the currently authenticated user with roles and outlet context."""
     user = request.user
-    roles = list(user.groups.values_list("name", flat=True))
+    roles = list(_group_names(request))
     if user.is_superuser and "Owner" not in roles:
         roles.append("Owner")
 
-    role_map = {"owner": "owner", "manager": "manager", "cashier": "cashier"}
-    normalized_roles = sorted({role_map.get(role.lower(), role.lower()) for role in roles})
-
-    profile = getattr(user, "profile", None)
+    seen = set()
+    normalized_roles = []
+    for role in roles:
+        lowered = role.lower()
+        key = ROLE_MAP.get(lowered, lowered)
+        if key not in seen:
+            seen.add(key)
+            normalized_roles.append(key)
+    if len(normalized_roles) > 1:
+        normalized_roles.sort()
+
+    profile = _user_profile(request)
     outlet_id = getattr(profile, "outlet_id", None)
     if profile and profile.outlet_id and getattr(profile, "outlet", None):
         outlets_data = [{"id": profile.outlet_id, "name": profile.outlet.name}]
@@ -110,142 +170,28 @@ def me(request):
     })
 
 
-@api_view(["GET"])
-@permission_classes([AllowAny])
+@require_safe
 def health(request):
-    """Simple health check"""
-    return Response({"status": "ok"})
+    """Simple health check, served without the DRF stack since probes hit it constantly."""
+    return HttpResponse(HEALTH_BODY, content_type="application/json")
 
 
-@api_view(["GET"])
-@permission_classes([AllowAny])
+@require_safe
 def health_db(request):
-    """Verify database connectivity by executing a lightweight query."""
-    try:
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT 1")
-            cursor.fetchone()
-    except Exception as exc:
-        return Response({"ok": False, "error": str(exc)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-    return Response({"ok": True})
+    """Verify database connectivity by executing a lightweight query.
 
-
-# --- Reports used by the dashboard -------------------------------------------
-
-def _parse_range(request):
-    """
-    Accepts:
-      from, to (ISO)  OR  days (int, default 30)
-    Returns (start_dt, end_dt) tz-aware.
+    The result is cached for a second so bursts of load-balancer probes share one query.
     """
-    tz = timezone.get_current_timezone()
-    q_from = request.query_params.get("from")
-    q_to = request.query_params.get("to")
-    q_days = request.query_params.get("days")
-
-    if q_from and q_to:
-        try:
-            start_raw = timezone.datetime.fromisoformat(q_from)
-            start = timezone.make_aware(start_raw) if start_raw.tzinfo is None else start_raw
-        except Exception:
-            start = timezone.now() - timedelta(days=30)
-        try:
-            end_raw = timezone.datetime.fromisoformat(q_to)
-            end = timezone.make_aware(end_raw) if end_raw.tzinfo is None else end_raw
-        except Exception:
-            end = timezone.now()
-    else:
+    error = cache.get(HEALTH_DB_CACHE_KEY)
+    if error is None:
         try:
-            days = max(1, int(q_days or "30"))
-        except Exception:
-            days = 30
-        end = timezone.now()
-        start = end - timedelta(days=days)
-
-    if start > end:
-        start, end = end - timedelta(days=30), end
-    return start, end
-
-
-@api_view(["GET"])
-@permission_classes([IsAuthenticated])
-def reports_sales_trend(request):
-    """
-    GET /api/reports/sales-trend/?granularity=daily|weekly|monthly&from=...&to=...&days=30
-    Returns: [{ "date": "YYYY-MM-DD", "amount": 1234.56 }, ...]
-    """
-    granularity = (request.query_params.get("granularity") or "daily").lower()
-    start, end = _parse_range(request)
-
-    if granularity == "weekly":
-        trunc = TruncWeek("date")
-    elif granularity == "monthly":
-        trunc = TruncMonth("date")
-    else:
-        trunc = TruncDay("date")
-
-    qs = (
-        Sale.objects.filter(date__gte=start, date__lte=end)
-        .annotate(bucket=trunc)
-        .values("bucket")
-        .annotate(amount=Sum("total"))
-        .order_by("bucket")
-    )
-
-    data = [{"date": x["bucket"].date().isoformat(), "amount": float(x["amount"] or 0)} for x in qs]
-    return Response(data)
-
-
-@api_view(["GET"])
-@permission_classes([IsAuthenticated])
-def reports_top_products(request):
-    """
-    GET /api/reports/top-products/?limit=5&from=...&to=...&days=30
-    Returns: [{ "name": "<Product>", "value": <revenue> }, ...]
-    """
-    try:
-        limit = max(1, int(request.query_params.get("limit", "5")))
-    except Exception:
-        limit = 5
-
-    start, end = _parse_range(request)
-
-    # Resolve SaleItem dynamically to avoid hard import errors
-    SaleItem = apps.get_model("bakery", "SaleItem")
-    if SaleItem is None:
-        return Response([], status=200)
-
-    amount_expr = F("line_total") if "line_total" in [f.name for f in SaleItem._meta.fields] else F("price") * F("quantity")
-
-    qs = (
-        SaleItem.objects.filter(sale__date__gte=start, sale__date__lte=end)
-        .values("product__name")
-        .annotate(value=Sum(amount_expr))
-        .order_by("-value")[:limit]
-    )
-    data = [{"name": x["product__name"], "value": float(x["value"] or 0)} for x in qs]
-    return Response(data)
-
-
-@api_view(["GET"])
-@permission_classes([IsAuthenticated])
-def reports_top_outlets(request):
-    """
-    GET /api/reports/top-outlets/?limit=5&from=...&to=...&days=30
-    Returns: [{ "name": "<Outlet>", "value": <revenue> }, ...]
-    """
-    try:
-        limit = max(1, int(request.query_params.get("limit", "5")))
-    except Exception:
-        limit = 5
-
-    start, end = _parse_range(request)
-
-    qs = (
-        Sale.objects.filter(date__gte=start, date__lte=end)
-        .values("outlet__name")
-        .annotate(value=Sum("total"))
-        .order_by("-value")[:limit]
-    )
-    data = [{"name": x["outlet__name"] or "Unknown", "value": float(x["value"] or 0)} for x in qs]
-    return Response(data)
\ No newline at end of file
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            error = ""
+        except Exception as exc:
+            error = str(exc) or exc.__class__.__name__
+        cache.set(HEALTH_DB_CACHE_KEY, error, HEALTH_DB_CACHE_TTL)
+    if error:
+        return JsonResponse({"ok": False, "error": error}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    return HttpResponse(_HEALTH_DB_OK_BODY, content_type="application/json")
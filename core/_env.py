@@ -0,0 +1,25 @@
+"""Typed environment values derived once for the settings module."""
+
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+
+
+@dataclass(frozen=True, slots=True)
+class Env:
+    jwt_access_min: int
+    jwt_refresh_days: int
+    throttle_rate_user: str
+    throttle_rate_auth: str
+
+    @classmethod
+    @lru_cache(maxsize=1)
+    def load(cls) -> "Env":
+        """Parse the environment once; call after ``.env`` has been loaded."""
+        throttle_rate_user = os.getenv("THROTTLE_RATE_USER", "120/min")
+        return cls(
+            jwt_access_min=int(os.getenv("JWT_ACCESS_MIN", "60")),
+            jwt_refresh_days=int(os.getenv("JWT_REFRESH_DAYS", "7")),
+            throttle_rate_user=throttle_rate_user,
+            throttle_rate_auth=os.getenv("THROTTLE_RATE_AUTH", throttle_rate_user),
+        )
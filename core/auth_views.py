@@ -2,10 +2,12 @@
 
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
+from .throttling import AuthRateThrottle
+
 
 class ThrottledTokenObtainPairView(TokenObtainPairView):
-    throttle_scope = "auth"
+    throttle_classes = [AuthRateThrottle]
 
 
 class ThrottledTokenRefreshView(TokenRefreshView):
-    throttle_scope = "auth"
+    throttle_classes = [AuthRateThrottle]
@@ -0,0 +1,28 @@
+"""JWT authentication that loads the user's profile and outlet with the user."""
+
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+
+class _JoinedUserModel:
+    """Stand-in for the user model whose ``objects`` joins the given relations.
+
+    Everything else (``DoesNotExist``, ``_meta`` ...) is delegated to the model.
+    """
+
+    def __init__(self, model, *related):
+        self._model = model
+        self.objects = model.objects.select_related(*related)
+
+    def __getattr__(self, name):
+        return getattr(self._model, name)
+
+
+class ProfileJWTAuthentication(JWTAuthentication):
+    """Resolve the token's user with ``profile__outlet`` joined in, saving a query per request.
+
+    Only the user lookup changes; simplejwt's own ``get_user`` still runs all its checks.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.user_model = _JoinedUserModel(self.user_model, "profile__outlet")
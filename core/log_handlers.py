@@ -0,0 +1,53 @@
+"""Logging handlers that keep log I/O off the request thread."""
+
+import atexit
+import copy
+import logging
+import os
+import queue
+import threading
+from logging.handlers import QueueListener
+
+
+class QueuedStreamHandler(logging.Handler):
+    """Format records on the caller's thread and write them to a stream from a background thread.
+
+    A plain ``Handler`` that owns its queue and listener, so ``dictConfig``
+    treats it like any other handler class. The listener is started lazily in
+    each process, so workers forked after settings are loaded (e.g. gunicorn
+    --preload) get their own.
+    """
+
+    def __init__(self, stream=None):
+        super().__init__()
+        self._target = logging.StreamHandler(stream)
+        self._start_lock = threading.Lock()
+        self._queue = None
+        self._pid = None
+
+    def _ensure_listener(self) -> None:
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            # A queue inherited across fork has no consumer; start a fresh one.
+            self._queue = queue.SimpleQueue()
+            listener = QueueListener(self._queue, self._target)
+            listener.start()
+            atexit.register(listener.stop)
+            self._pid = os.getpid()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self._ensure_listener()
+            # Pre-format here (as QueueHandler.prepare does) so the listener
+            # only writes the finished line.
+            record = copy.copy(record)
+            record.msg = self.format(record)
+            record.args = None
+            record.exc_info = None
+            record.exc_text = None
+            self._queue.put_nowait(record)
+        except Exception:
+            self.handleError(record)
@@ -1,41 +1,98 @@
 """Custom middleware for instrumentation and request logging."""
 
 import logging
+import re
 import time
 from typing import Callable
 
-from django.http import HttpRequest, HttpResponse
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpRequest, HttpResponse, HttpResponseForbidden
+from django.utils.functional import SimpleLazyObject
+
+from bakery.health import HEALTH_BODY
+
+
+HEALTH_PATH = "/api/health/"
 
 
 class RequestTimingMiddleware:
-    """Log basic metadata and duration for every incoming HTTP request."""
+    """Log basic metadata and duration for every incoming HTTP request.
+
+    Liveness probes to ``HEALTH_PATH`` are answered here directly, skipping the
+    rest of the middleware chain, URL resolution and the request log.
+    """
 
     logger = logging.getLogger("bakery.request")
 
     def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
         self.get_response = get_response
+        self._log = self.logger.info
 
     def __call__(self, request: HttpRequest) -> HttpResponse:
-        start = time.perf_counter()
+        if request.path == HEALTH_PATH and request.method in ("GET", "HEAD"):
+            return HttpResponse(HEALTH_BODY, content_type="application/json")
+
+        start = time.monotonic_ns()
         response = self.get_response(request)
-        duration_ms = (time.perf_counter() - start) * 1000
+        duration_ms = (time.monotonic_ns() - start) / 1_000_000
 
         user = getattr(request, "user", None)
-        user_id = getattr(user, "id", None) if user and user.is_authenticated else None
+        if isinstance(user, SimpleLazyObject):
+            # Only log a session user the view already loaded; resolving it here
+            # would cost a session + auth_user lookup on otherwise query-free requests.
+            user = getattr(request, "_cached_user", None)
+        user_id = getattr(user, "id", None) if user is not None and user.is_authenticated else None
 
-        self.logger.info(
+        full_path = request.get_full_path()
+        self._log(
             "%s %s -> %s in %.2fms user=%s",
             request.method,
-            request.get_full_path(),
+            full_path,
             getattr(response, "status_code", "-"),
             duration_ms,
             user_id if user_id is not None else "-",
             extra={
                 "method": request.method,
-                "path": request.get_full_path(),
+                "path": full_path,
                 "status_code": getattr(response, "status_code", None),
                 "duration_ms": duration_ms,
                 "user_id": user_id,
             },
         )
         return response
+
+
+class PreflightOriginMiddleware:
+    """Reject CORS preflights from origins django-cors-headers would not allow.
+
+    Placed first in ``MIDDLEWARE`` so probes from unknown origins are refused
+    before the CORS, session or timing middleware do any work. Mirrors
+    ``CORS_ALLOWED_ORIGINS`` and ``CORS_ALLOWED_ORIGIN_REGEXES``, and steps
+    aside entirely when ``CORS_ALLOW_ALL_ORIGINS`` is on.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        if getattr(settings, "CORS_ALLOW_ALL_ORIGINS", False):
+            raise MiddlewareNotUsed("CORS_ALLOW_ALL_ORIGINS accepts every origin")
+        self.get_response = get_response
+        self.allowed_origins = frozenset(getattr(settings, "CORS_ALLOWED_ORIGINS", ()))
+        self.origin_regexes = tuple(
+            re.compile(pattern) for pattern in getattr(settings, "CORS_ALLOWED_ORIGIN_REGEXES", ())
+        )
+        self.urls_regex = re.compile(getattr(settings, "CORS_URLS_REGEX", r"^.*$"))
+
+    def _origin_allowed(self, origin) -> bool:
+        if origin in self.allowed_origins:
+            return True
+        return origin is not None and any(regex.match(origin) for regex in self.origin_regexes)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if (
+            request.method == "OPTIONS"
+            and "access-control-request-method" in request.headers
+            and not self._origin_allowed(request.headers.get("origin"))
+            and self.urls_regex.match(request.path_info)
+        ):
+            return HttpResponseForbidden()
+        return self.get_response(request)
@@ -0,0 +1,30 @@
+"""Error reporting setup, run from the server entry points rather than settings."""
+
+import logging
+import os
+
+from django.conf import settings
+
+
+def init_sentry() -> None:
+    """Initialise Sentry when ``SENTRY_DSN`` is configured."""
+    if not settings.SENTRY_DSN:
+        return
+    try:
+        import sentry_sdk
+        from sentry_sdk.integrations.django import DjangoIntegration
+        from sentry_sdk.integrations.logging import LoggingIntegration
+
+        sentry_logging = LoggingIntegration(
+            level=logging.INFO,
+            event_level=logging.ERROR,
+        )
+        sentry_sdk.init(
+            dsn=settings.SENTRY_DSN,
+            integrations=[DjangoIntegration(), sentry_logging],
+            traces_sample_rate=float(os.getenv("SENTRY_TRACES_SAMPLE_RATE", "0.0")),
+            environment=os.getenv("SENTRY_ENVIRONMENT"),
+            send_default_pii=True,
+        )
+    except Exception as exc:  # pragma: no cover - protect boot
+        logging.getLogger("django").warning("Sentry init failed: %s", exc)
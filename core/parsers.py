@@ -0,0 +1,19 @@
+"""JSON parser backed by orjson."""
+
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from .renderers import OrjsonRenderer
+
+
+class OrjsonParser(JSONParser):
+    """Parse UTF-8 JSON request bodies with orjson."""
+
+    renderer_class = OrjsonRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
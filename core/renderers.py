@@ -0,0 +1,22 @@
+"""JSON renderer backed by orjson."""
+
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# DRF's encoder still handles what orjson doesn't natively (Decimal, lazy
+# strings, querysets ...) and keeps DRF's datetime formatting.
+_drf_encoder = JSONEncoder()
+
+
+class OrjsonRenderer(JSONRenderer):
+    """Render compact JSON with orjson; indented output falls back to DRF's renderer."""
+
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return orjson.dumps(data, default=_drf_encoder.default, option=self.options)
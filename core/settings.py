@@ -1,23 +1,29 @@
 # core/settings.py
 from pathlib import Path
 import os
-import logging
 from datetime import timedelta
+from urllib.parse import urlsplit
+
 from dotenv import load_dotenv
 
-load_dotenv()  # reads .env if present
+from core._env import Env
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Explicit path: skips find_dotenv()'s stack inspection and directory walk.
+load_dotenv(BASE_DIR / ".env")  # reads .env if present
+
+ENV = Env.load()
+
 # --- Basic project settings ---
 SECRET_KEY = os.getenv("SECRET_KEY", "dev-insecure-secret-key")
 DEBUG = os.getenv("DEBUG", "1") == "1"
 
-def _csv(env_name: str) -> list[str]:
+def _csv(env_name: str) -> tuple[str, ...]:
     raw = os.getenv(env_name, "")
-    return [x.strip() for x in raw.split(",") if x.strip()]
+    return tuple(x.strip() for x in raw.split(",") if x.strip())
 
-ALLOWED_HOSTS = _csv("ALLOWED_HOSTS")
+ALLOWED_HOSTS = tuple(dict.fromkeys(_csv("ALLOWED_HOSTS")))
 
 # You can also set CSRF_TRUSTED_ORIGINS via env, but we’ll merge with defaults below
 CSRF_TRUSTED_ORIGINS = _csv("CSRF_TRUSTED_ORIGINS")
@@ -46,17 +52,23 @@ INSTALLED_APPS = [
 
 # --- Middleware (CORS should be near the top) ---
 MIDDLEWARE = [
+    "core.middleware.PreflightOriginMiddleware",
     "corsheaders.middleware.CorsMiddleware",
+    "core.middleware.RequestTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
-    "core.middleware.RequestTimingMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Sessions only back the admin and the browsable API; keeping them in a signed
+# cookie means loading one never costs a database or cache round-trip.
+SESSION_ENGINE = "django.contrib.sessions.backends.signed_cookies"
+
 ROOT_URLCONF = "core.urls"
 
 # --- Templates / WSGI ---
@@ -79,6 +91,11 @@ WSGI_APPLICATION = "core.wsgi.application"
 
 # --- Database ---
 # If Postgres env vars are present, use them; otherwise fallback to SQLite (good for dev).
+# Connections are kept open per worker for DJANGO_CONN_MAX_AGE seconds; set it to 0
+# when running behind pgbouncer in transaction pooling mode so pgbouncer does the pooling.
+CONN_MAX_AGE = int(os.getenv("DJANGO_CONN_MAX_AGE", "60"))
+CONN_HEALTH_CHECKS = os.getenv("DJANGO_CONN_HEALTH", "1") == "1"
+
 if os.getenv("PGHOST"):
     DATABASES = {
         "default": {
@@ -88,35 +105,101 @@ if os.getenv("PGHOST"):
             "PASSWORD": os.getenv("PGPASSWORD", ""),
             "HOST": os.getenv("PGHOST", "localhost"),
             "PORT": os.getenv("PGPORT", "5432"),
+            "CONN_MAX_AGE": CONN_MAX_AGE,
+            "CONN_HEALTH_CHECKS": CONN_HEALTH_CHECKS,
+            "OPTIONS": {
+                "connect_timeout": 5,
+                "options": "-c statement_timeout=15000",
+                # Detect connections silently dropped by a load balancer or NAT.
+                "keepalives": 1,
+                "keepalives_idle": 30,
+                "keepalives_interval": 10,
+                "keepalives_count": 3,
+            },
         }
     }
+    # Opt-in prepared statements (PG_SERVER_SIDE_BINDING=1): psycopg only prepares
+    # queries on server-side-binding cursors, after PG_PREPARE_THRESHOLD runs on a
+    # connection. Leave off behind pgbouncer's transaction pooling, which can't
+    # keep prepared statements.
+    if os.getenv("PG_SERVER_SIDE_BINDING", "0") == "1":
+        DATABASES["default"]["OPTIONS"].update({
+            "server_side_binding": True,
+            "prepare_threshold": int(os.getenv("PG_PREPARE_THRESHOLD", "3")),
+        })
 else:
     DATABASES = {
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
             "NAME": BASE_DIR / "db.sqlite3",
+            "CONN_MAX_AGE": CONN_MAX_AGE,
+            "CONN_HEALTH_CHECKS": CONN_HEALTH_CHECKS,
         }
     }
 
 # --- CACHE + RATE LIMIT START ---
 REDIS_URL = os.getenv("REDIS_URL")
+
+# Logical Redis databases, one per concern, so throttle counters and queue
+# traffic don't evict or crowd cached responses.
+REDIS_DB_CACHE = 1
+REDIS_DB_RQ = 2
+REDIS_DB_THROTTLE = 3
+
+
+def _redis_db(url: str, db: int) -> str:
+    return urlsplit(url)._replace(path=f"/{db}").geturl()
+
+
+def _redis_cache(db: int) -> dict:
+    return {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": _redis_db(REDIS_URL, db),
+        # Bumped with the msgpack switch so pickled entries are never read back.
+        "VERSION": 2,
+        "OPTIONS": {
+            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            "SERIALIZER": "django_redis.serializers.msgpack.MSGPackSerializer",
+            "CONNECTION_POOL_KWARGS": {"max_connections": 50, "retry_on_timeout": True},
+            "IGNORE_EXCEPTIONS": True,
+        },
+    }
+
+
 if REDIS_URL:
+    CACHES = {
+        "default": _redis_cache(REDIS_DB_CACHE),
+        "throttle": _redis_cache(REDIS_DB_THROTTLE),
+    }
+elif os.getenv("CACHE_SHARED", "0") == "1":
+    # Without Redis, share one cache between local gunicorn workers via tmpfs.
+    _cache_dir = Path(os.getenv("CACHE_SHARED_DIR", "/dev/shm/bakery-cache"))
     CACHES = {
         "default": {
-            "BACKEND": "django_redis.cache.RedisCache",
-            "LOCATION": REDIS_URL,
-            "OPTIONS": {
-                "CLIENT_CLASS": "django_redis.client.DefaultClient",
-                "IGNORE_EXCEPTIONS": True,
-            },
-        }
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": _cache_dir / "default",
+            "TIMEOUT": 300,
+            "OPTIONS": {"MAX_ENTRIES": 10000, "CULL_FREQUENCY": 4},
+        },
+        "throttle": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": _cache_dir / "throttle",
+            "OPTIONS": {"MAX_ENTRIES": 10000, "CULL_FREQUENCY": 4},
+        },
     }
 else:
     CACHES = {
         "default": {
             "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
             "LOCATION": "bakery-perf-cache",
-        }
+            "TIMEOUT": 300,
+            "OPTIONS": {"MAX_ENTRIES": 10000, "CULL_FREQUENCY": 4},
+        },
+        "throttle": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "bakery-throttle",
+            "OPTIONS": {"MAX_ENTRIES": 10000, "CULL_FREQUENCY": 4},
+        },
     }
 # --- CACHE + RATE LIMIT END ---
 
@@ -124,7 +207,7 @@ else:
 if REDIS_URL:
     RQ_QUEUES = {
         "default": {
-            "URL": REDIS_URL,
+            "URL": _redis_db(REDIS_URL, REDIS_DB_RQ),
             "DEFAULT_TIMEOUT": int(os.getenv("RQ_DEFAULT_TIMEOUT", "600")),
         }
     }
@@ -154,6 +237,13 @@ USE_TZ = True
 # --- Static files ---
 STATIC_URL = "static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
+# WhiteNoise serves STATIC_ROOT with gzip/Brotli variants written by collectstatic.
+# Not the manifest storage: the committed staticfiles/ has no manifest, and
+# {% static %} would fail at runtime until collectstatic ran in every deploy.
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "whitenoise.storage.CompressedStaticFilesStorage"},
+}
 
 # --- CORS ---
 ALLOWED_ORIGINS = _csv("ALLOWED_ORIGINS")
@@ -163,8 +253,12 @@ if not ALLOWED_ORIGINS:
         "http://localhost:3000",
     ]
 
-CORS_ALLOWED_ORIGINS = ALLOWED_ORIGINS
+CORS_ALLOWED_ORIGINS = tuple(dict.fromkeys(ALLOWED_ORIGINS))
 CORS_ALLOW_CREDENTIALS = False
+# Only the API is called cross-origin; admin/static skip the CORS checks entirely.
+CORS_URLS_REGEX = r"^/api/"
+# Let browsers reuse a preflight result for a day.
+CORS_PREFLIGHT_MAX_AGE = 86400
 
 # Make preflights permissive and predictable
 CORS_ALLOW_HEADERS = ["*"]
@@ -178,18 +272,27 @@ _default_csrf = [
     "https://bakery-app-backend-production.up.railway.app",
 ]
 # merge env-provided with defaults, dedup
-CSRF_TRUSTED_ORIGINS = list(dict.fromkeys(CSRF_TRUSTED_ORIGINS + _default_csrf + CORS_ALLOWED_ORIGINS))
+CSRF_TRUSTED_ORIGINS = tuple(dict.fromkeys((*CSRF_TRUSTED_ORIGINS, *_default_csrf, *CORS_ALLOWED_ORIGINS)))
 
 # --- DRF, JWT & API schema ---
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "core.authentication.ProfileJWTAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.renderers.OrjsonRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "core.parsers.OrjsonParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend",
     ],
@@ -197,18 +300,29 @@ REST_FRAMEWORK = {
     "PAGE_SIZE": 20,
     # --- CACHE + RATE LIMIT START ---
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.UserRateThrottle",
+        "core.throttling.RedisUserRateThrottle" if REDIS_URL else "core.throttling.UserRateThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {
-        "user": os.getenv("THROTTLE_RATE_USER", "120/min"),
+        "user": ENV.throttle_rate_user,
+        "auth": ENV.throttle_rate_auth,
     },
     # --- CACHE + RATE LIMIT END ---
 }
 
 SIMPLE_JWT = {
-    "ACCESS_TOKEN_LIFETIME": timedelta(minutes=int(os.getenv("JWT_ACCESS_MIN", "60"))),
-    "REFRESH_TOKEN_LIFETIME": timedelta(days=int(os.getenv("JWT_REFRESH_DAYS", "7"))),
+    "ACCESS_TOKEN_LIFETIME": timedelta(minutes=ENV.jwt_access_min),
+    "REFRESH_TOKEN_LIFETIME": timedelta(days=ENV.jwt_refresh_days),
 }
+# Optional asymmetric signing: PEM key files are read once here. Without them
+# tokens stay HS256-signed with SECRET_KEY.
+JWT_PRIVATE_KEY = os.getenv("JWT_PRIVATE_KEY")
+JWT_PUBLIC_KEY = os.getenv("JWT_PUBLIC_KEY")
+if JWT_PRIVATE_KEY and JWT_PUBLIC_KEY:
+    SIMPLE_JWT.update({
+        "ALGORITHM": os.getenv("JWT_ALGORITHM", "ES256"),
+        "SIGNING_KEY": Path(JWT_PRIVATE_KEY).read_bytes(),
+        "VERIFYING_KEY": Path(JWT_PUBLIC_KEY).read_bytes(),
+    })
 
 SPECTACULAR_SETTINGS = {
     "TITLE": "Bakery API",
@@ -226,26 +340,9 @@ R2_SECRET_ACCESS_KEY = os.getenv("R2_SECRET_ACCESS_KEY", "")
 
 # --- Observability ---------------------------------------------------------
 
+# Sentry is initialised by core.observability.init_sentry() from the WSGI/ASGI
+# entry points (and the qcluster worker), keeping it out of other manage.py commands.
 SENTRY_DSN = os.getenv("SENTRY_DSN")
-if SENTRY_DSN:
-    try:
-        import sentry_sdk
-        from sentry_sdk.integrations.django import DjangoIntegration
-        from sentry_sdk.integrations.logging import LoggingIntegration
-
-        sentry_logging = LoggingIntegration(
-            level=logging.INFO,
-            event_level=logging.ERROR,
-        )
-        sentry_sdk.init(
-            dsn=SENTRY_DSN,
-            integrations=[DjangoIntegration(), sentry_logging],
-            traces_sample_rate=float(os.getenv("SENTRY_TRACES_SAMPLE_RATE", "0.0")),
-            environment=os.getenv("SENTRY_ENVIRONMENT"),
-            send_default_pii=True,
-        )
-    except Exception as exc:  # pragma: no cover - protect boot
-        logging.getLogger("django").warning("Sentry init failed: %s", exc)
 
 LOGGING = {
     "version": 1,
@@ -259,7 +356,12 @@ LOGGING = {
         "console": {
             "class": "logging.StreamHandler",
             "formatter": "verbose",
-        }
+        },
+        # Per-request timing lines are written by a background listener thread.
+        "request_queue": {
+            "class": "core.log_handlers.QueuedStreamHandler",
+            "formatter": "verbose",
+        },
     },
     "loggers": {
         "django": {
@@ -272,31 +374,41 @@ LOGGING = {
             "propagate": False,
         },
         "bakery.request": {
-            "handlers": ["console"],
+            "handlers": ["request_queue"],
             "level": os.getenv("REQUEST_LOG_LEVEL", "INFO"),
             "propagate": False,
         },
     },
 }
 
+# Production security settings, applied in one update.
 if not DEBUG:
-    SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
-    SECURE_SSL_REDIRECT = True
-    SESSION_COOKIE_SECURE = True
-    CSRF_COOKIE_SECURE = True
-    SECURE_HSTS_SECONDS = 31536000
-    SECURE_HSTS_INCLUDE_SUBDOMAINS = True
-    SECURE_HSTS_PRELOAD = True
-    SECURE_CONTENT_TYPE_NOSNIFF = True
-    SECURE_REFERRER_POLICY = "strict-origin-when-cross-origin"
-    X_FRAME_OPTIONS = "DENY"
+    globals().update({
+        "SECURE_PROXY_SSL_HEADER": ("HTTP_X_FORWARDED_PROTO", "https"),
+        "SECURE_SSL_REDIRECT": True,
+        "SESSION_COOKIE_SECURE": True,
+        "CSRF_COOKIE_SECURE": True,
+        "SECURE_HSTS_SECONDS": 31536000,
+        "SECURE_HSTS_INCLUDE_SUBDOMAINS": True,
+        "SECURE_HSTS_PRELOAD": True,
+        "SECURE_CONTENT_TYPE_NOSNIFF": True,
+        "SECURE_REFERRER_POLICY": "strict-origin-when-cross-origin",
+        "X_FRAME_OPTIONS": "DENY",
+    })
 
 Q_CLUSTER = {
     "name": "bakery",
-    "workers": 2,
+    "workers": int(os.getenv("Q_WORKERS", str(max(2, os.cpu_count() or 2)))),
+    "recycle": 500,
     "timeout": 90,
     "retry": 120,
     "queue_limit": 50,
     "bulk": 10,
-    "orm": "default",
 }
+# Prefer Redis as the task broker; the ORM broker polls the app database.
+if REDIS_URL:
+    Q_CLUSTER["redis"] = REDIS_URL
+else:
+    Q_CLUSTER["orm"] = "default"
+    # Seconds the ORM broker sleeps on an empty queue (django-q's default is 0.2).
+    Q_CLUSTER["poll"] = int(os.getenv("Q_POLL", "5"))
@@ -0,0 +1,86 @@
+"""Throttle classes shared across the API."""
+
+import logging
+
+from django.core.cache import caches
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+from rest_framework import throttling
+from rest_framework.throttling import SimpleRateThrottle
+
+log = logging.getLogger(__name__)
+
+
+class UserRateThrottle(throttling.UserRateThrottle):
+    """DRF's per-user throttle, keeping its counters in the ``throttle`` cache."""
+
+    cache = caches["throttle"]
+
+
+class RedisUserRateThrottle(UserRateThrottle):
+    """Fixed-window per-user limit counted atomically in Redis.
+
+    One script call (INCR, EXPIRE when the key has no TTL, TTL) replaces the
+    cache GET + SET of the request history list. Requires the ``throttle``
+    cache to be django-redis; if Redis is unreachable the request is allowed,
+    matching the cache's IGNORE_EXCEPTIONS behaviour.
+    """
+
+    # Re-arming on a missing TTL (not only when the count is 1) also heals
+    # counters left without an expiry.
+    incr_script = """
+    local count = redis.call('INCR', KEYS[1])
+    local ttl = redis.call('TTL', KEYS[1])
+    if ttl < 0 then
+        redis.call('EXPIRE', KEYS[1], ARGV[1])
+        ttl = tonumber(ARGV[1])
+    end
+    return {count, ttl}
+    """
+    _script = None
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        client = get_redis_connection("throttle")
+        cls = type(self)
+        if cls._script is None:
+            cls._script = client.register_script(self.incr_script)
+        try:
+            count, self._ttl = cls._script(keys=[self.key], args=[self.duration], client=client)
+        except RedisError:
+            log.warning("Throttle check skipped: Redis unavailable", exc_info=True)
+            return True
+        return count <= self.num_requests
+
+    def wait(self):
+        return max(self._ttl, 0)
+
+
+class AuthRateThrottle(SimpleRateThrottle):
+    """Per-user (or per-IP when anonymous) limit for the token endpoints.
+
+    The ``auth`` rate string is parsed once per process rather than on every request.
+    """
+
+    scope = "auth"
+    cache = caches["throttle"]
+    _parsed_rate = None
+
+    def __init__(self):
+        cls = type(self)
+        if cls._parsed_rate is None:
+            rate = self.get_rate()
+            cls._parsed_rate = (rate, self.parse_rate(rate))
+        self.rate, (self.num_requests, self.duration) = cls._parsed_rate
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {"scope": self.scope, "ident": ident}
@@ -10,7 +10,17 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 import os
 
 from django.core.wsgi import get_wsgi_application
+from django.urls import get_resolver
+
+from core.observability import init_sentry
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
 
+# Before the application is built, so DjangoIntegration can wrap the middleware.
+init_sentry()
+
 application = get_wsgi_application()
+
+# Compile URL patterns and reverse-lookup tables now rather than on the first
+# request; with a preloading server (gunicorn --preload) forked workers share them.
+get_resolver()._populate()
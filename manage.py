@@ -13,6 +13,11 @@ def main():
             "available on your PYTHONPATH environment variable? Did you "
             "forget to activate a virtual environment?"
         ) from exc
+    if sys.argv[1:2] == ['qcluster']:
+        # Long-running task worker: report its errors like the web processes do.
+        # Initialised before django.setup(), as in wsgi.py/asgi.py.
+        from core.observability import init_sentry
+        init_sentry()
     execute_from_command_line(sys.argv)
 
 if __name__ == '__main__':